@@ -9,18 +9,18 @@ Features:
 - Intercepts and forwards HTTP GET requests.
 - Caches responses to reduce redundant network requests.
 - Handles only HTTP (not HTTPS) requests.
+- Serves many clients concurrently on a single asyncio event loop (uses uvloop if installed).
 - Works with web browsers or command-line tools like `curl` with proxy settings.
 
 Limitations:
 - Does not support HTTPS (CONNECT requests will be rejected).
-- Single-threaded: can handle only one request at a time.
 - Only works for HTTP requests on port 80.
 
 Usage:
 1. Run: `python3 proxyserver.py`
 2. Configure your web browser to use `127.0.0.1:8888` as the proxy.
 3. Visit a website using HTTP (e.g., `http://gaia.cs.umass.edu/wireshark-labs/HTTP-wireshark-file2.html`).
-4. Cached responses will be served if available.
+4. Cached responses will be served while they are fresh (stale ones are revalidated first).
 5. To force a fresh request from the server instead of using cached content:
    - **Google Chrome:** Press `Ctrl + Shift + R` (Windows/Linux) or `Cmd + Shift + R` (Mac).
    - **Firefox:** Press `Ctrl + F5` (Windows/Linux) or `Cmd + Shift + R` (Mac).
@@ -30,7 +30,21 @@ Usage:
 """
 
 import socket  # Networking module
+import asyncio # Event loop serving all clients concurrently on one thread
+import logging # Log messages, with debug output disabled by default
 import os      # File system module
+import hashlib   # Hashing URLs into cache keys
+import tempfile  # Temporary files for atomic cache writes
+import shutil    # Copying large cached bodies into updated cache files
+import time       # Timestamps for cache freshness checks
+from email.parser import BytesHeaderParser  # Parses HTTP response headers
+from email.utils import parsedate_tz, mktime_tz  # Parses HTTP dates (Date, Expires, ...)
+from collections import OrderedDict, deque  # LRU caches and connection pool
+
+try:
+    import uvloop  # Optional: faster drop-in replacement for the asyncio event loop
+except ImportError:
+    uvloop = None
 
 ###############################################################################
 # CONFIGURATION
@@ -39,11 +53,339 @@ import os      # File system module
 HOST = '127.0.0.1'   # Proxy listens on localhost
 PORT = 8888          # Proxy port
 CACHE_DIR = 'cache'  # Directory for cached responses
+DISK_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Max total size of the disk cache (512 MB)
+LISTEN_BACKLOG = 128 # Pending connections the OS queues before accept()
+MAX_CLIENTS = 1024   # Clients handled at the same time; further ones wait in the backlog
+ACCEPT_RETRY_DELAY = 0.1  # Seconds to pause after accept() fails (e.g., out of file descriptors)
+CLIENT_TIMEOUT = 30  # Seconds to wait on a silent client before giving up
+MEMORY_CACHE_MAX_ENTRIES = 256            # Max responses kept in the in-memory cache
+MEMORY_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Max total size of the in-memory cache (32 MB)
+SOCKET_BUFFER_SIZE = 512 * 1024  # Kernel send/receive buffer size for client and server sockets
+RECV_BUFFER_SIZE = 65536  # Size of the buffer used to read responses from web servers
+BUFFER_POOL_SIZE = 16     # Receive buffers kept for reuse (more are created on demand, then dropped)
+SERVER_TIMEOUT = 10  # Seconds to wait on a web server before giving up
+MAX_IDLE_CONNECTIONS_PER_HOST = 4  # Kept-alive web server connections reused per hostname
+MAX_IDLE_CONNECTIONS = 64          # Kept-alive web server connections across all hostnames
+IDLE_CONNECTION_TIMEOUT = 30       # Seconds an unused kept-alive connection stays open
+DEFAULT_MAX_AGE = 0  # Seconds a response without any freshness information stays fresh (0 = always revalidate)
+HEURISTIC_FRESHNESS_FRACTION = 0.1  # Fraction of a page's age (since Last-Modified) it stays fresh
+HEURISTIC_MAX_AGE = 24 * 3600       # Upper limit for that heuristic freshness, in seconds
+LOG_LEVEL = logging.INFO  # Set to logging.DEBUG to trace every request
+
+log = logging.getLogger("proxy")
 
 # Ensure cache directory exists
 if not os.path.exists(CACHE_DIR):
     os.makedirs(CACHE_DIR)
-    print(f"[DEBUG] Created cache directory '{CACHE_DIR}'.")
+    log.debug("Created cache directory '%s'.", CACHE_DIR)
+
+###############################################################################
+# DISK CACHE INDEX
+###############################################################################
+
+# Index of the cache files stored on disk, so a lookup is a dictionary test instead of
+# stat() system calls. Like the in-memory cache it is kept in least- to most-recently-
+# used order, and the oldest files are deleted once the cache grows past
+# DISK_CACHE_MAX_BYTES. It is rebuilt from the directory at startup, oldest fetch
+# first; leftover temporary ".part" files from an interrupted write are not entries.
+disk_cache_index = OrderedDict()  # cache_key -> file size in bytes
+disk_cache_bytes = 0              # Total size of all files in disk_cache_index
+
+def add_to_disk_index(cache_key, size):
+    """
+    Records a cache file as the most recently used one, then deletes the least
+    recently used files until the disk cache fits in DISK_CACHE_MAX_BYTES again.
+    """
+    global disk_cache_bytes
+    remove_from_disk_index(cache_key)
+    disk_cache_index[cache_key] = size
+    disk_cache_bytes += size
+
+    while disk_cache_bytes > DISK_CACHE_MAX_BYTES:
+        evicted_key, evicted_size = disk_cache_index.popitem(last=False)
+        disk_cache_bytes -= evicted_size
+        try:
+            os.unlink(os.path.join(CACHE_DIR, evicted_key))
+        except FileNotFoundError:
+            pass
+        log.debug("Evicted from disk cache: %s", evicted_key)
+
+def remove_from_disk_index(cache_key):
+    """
+    Forgets a cache file, e.g. one that was deleted outside the proxy.
+    """
+    global disk_cache_bytes
+    size = disk_cache_index.pop(cache_key, None)
+    if size is not None:
+        disk_cache_bytes -= size
+
+# DirEntry.stat() is cached, so each file is only stat()ed once here
+for entry in sorted(
+        (entry for entry in os.scandir(CACHE_DIR)
+         if entry.is_file() and not entry.name.endswith(".part")),
+        key=lambda entry: entry.stat().st_mtime):
+    add_to_disk_index(entry.name, entry.stat().st_size)
+
+###############################################################################
+# IN-MEMORY LRU CACHE
+###############################################################################
+
+# Hot responses are kept in memory in front of the disk cache. The OrderedDict is kept
+# in least- to most-recently-used order, so the oldest entry is always evicted first.
+# All clients are served on the event loop's single thread, and these functions never
+# await, so the shared cache needs no lock.
+memory_cache = OrderedDict()  # cache_key -> cache entry (see get_cached_content())
+memory_cache_bytes = 0        # Total size of all responses in memory_cache
+
+def get_from_memory(cache_key):
+    """
+    Returns the entry stored in memory for cache_key and marks it as most recently
+    used, or returns None if it is not in memory.
+    """
+    entry = memory_cache.get(cache_key)
+    if entry is not None:
+        memory_cache.move_to_end(cache_key)
+    return entry
+
+def store_in_memory(cache_key, entry):
+    """
+    Adds a cache entry to the in-memory cache, evicting least recently used entries
+    until both the entry count and total size limits are respected.
+    Responses larger than the whole memory budget (whose content is None, see
+    get_cached_content()) are left on disk only.
+    """
+    global memory_cache_bytes
+    content = entry[0]
+    if content is None or len(content) > MEMORY_CACHE_MAX_BYTES:
+        return
+
+    old_entry = memory_cache.pop(cache_key, None)
+    if old_entry is not None:
+        memory_cache_bytes -= len(old_entry[0])
+
+    memory_cache[cache_key] = entry
+    memory_cache_bytes += len(content)
+
+    while (len(memory_cache) > MEMORY_CACHE_MAX_ENTRIES
+           or memory_cache_bytes > MEMORY_CACHE_MAX_BYTES):
+        evicted_key, evicted_entry = memory_cache.popitem(last=False)
+        memory_cache_bytes -= len(evicted_entry[0])
+        log.debug("Evicted from memory cache: %s", evicted_key)
+
+###############################################################################
+# RECEIVE BUFFER POOL
+###############################################################################
+
+# Receive buffers are shared between requests instead of being allocated for every
+# one. Each request takes a buffer from the pool, fills it with recv_into(), and puts
+# it back when done. Only the bytes filled by the current recv_into() call are ever
+# read, so old contents left in a reused buffer don't matter.
+buffer_pool = [bytearray(RECV_BUFFER_SIZE) for _ in range(BUFFER_POOL_SIZE)]
+
+def get_buffer():
+    """
+    Takes a receive buffer from the pool, or allocates a new one if all are in use.
+    """
+    if buffer_pool:
+        return buffer_pool.pop()
+    return bytearray(RECV_BUFFER_SIZE)
+
+def release_buffer(buffer):
+    """
+    Returns a receive buffer to the pool. The caller must not keep any reference to it.
+    Buffers allocated during a burst are dropped once the pool is full again, so the
+    pool never holds more than BUFFER_POOL_SIZE buffers.
+    """
+    if len(buffer_pool) < BUFFER_POOL_SIZE:
+        buffer_pool.append(buffer)
+
+###############################################################################
+# HTTP CACHING RULES
+###############################################################################
+
+def parse_response_head(response_data):
+    """
+    Parses the status line and headers of a raw HTTP response.
+    Returns (status_code, headers), where headers is an email.message.Message with
+    case-insensitive lookups, or (None, None) if the status line is malformed.
+    """
+    head_end = response_data.find(b"\r\n\r\n")
+    head = response_data if head_end == -1 else response_data[:head_end]
+    status_line, _, header_block = head.partition(b"\r\n")
+
+    parts = status_line.split(None, 2)  # e.g., [b"HTTP/1.1", b"200", b"OK"]
+    if len(parts) < 2 or not parts[1].isdigit():
+        return None, None
+    return int(parts[1]), BytesHeaderParser().parsebytes(header_block)
+
+# Headers that only describe the connection between the proxy and the web server, so
+# they must not be passed on to the client or stored in the cache
+HOP_BY_HOP_HEADERS = {
+    b"connection", b"keep-alive", b"proxy-connection", b"te",
+    b"trailer", b"transfer-encoding", b"upgrade",
+}
+
+def filter_header_lines(head, dropped_names):
+    """
+    Splits a header block (ending in "\r\n\r\n") into its lines, without the final
+    empty line, leaving out every header whose lowercase name is in dropped_names.
+    The status line is always kept.
+    """
+    lines = head[:-4].split(b"\r\n")
+    kept_lines = [lines[0]]  # Status line
+    keep = True
+    for line in lines[1:]:
+        if line[:1] not in (b" ", b"\t"):  # Folded lines continue the previous header
+            keep = line.split(b":", 1)[0].strip().lower() not in dropped_names
+        if keep:
+            kept_lines.append(line)
+    return kept_lines
+
+def rewrite_response_head(head, headers):
+    """
+    Returns the header block of a response as it is passed on to the client and the
+    cache. Hop-by-hop headers (HOP_BY_HOP_HEADERS and any header listed in the
+    Connection header) are removed: the proxy talks keep-alive to the web server but
+    closes the client connection after each response, and decodes chunked bodies
+    itself. "Connection: close" is added instead, so the body simply ends when the
+    connection closes if there is no Content-Length.
+    """
+    hop_by_hop = set(HOP_BY_HOP_HEADERS)
+    for value in headers.get_all("Connection", []):
+        hop_by_hop.update(token.strip().lower().encode('ascii', errors='ignore')
+                          for token in value.split(","))
+
+    kept_lines = filter_header_lines(head, hop_by_hop)
+    kept_lines.append(b"Connection: close")
+    return b"\r\n".join(kept_lines) + b"\r\n\r\n"
+
+def update_response_head(head, headers):
+    """
+    Returns the header block of a cached response updated with the headers of a
+    304 Not Modified response, as RFC 9111 section 4.3.4 requires: every header the
+    304 carries replaces the cached header of the same name, so a new Cache-Control,
+    Expires or ETag takes effect. Hop-by-hop headers and Content-Length (which
+    describes the 304's own empty body) are not taken over.
+    """
+    skipped = HOP_BY_HOP_HEADERS | {b"content-length"}
+    new_fields = [(name.encode('ascii', errors='surrogateescape'), value)
+                  for name, value in headers.items()]
+    new_fields = [(name, value) for name, value in new_fields if name.lower() not in skipped]
+
+    lines = filter_header_lines(head, {name.lower() for name, _ in new_fields})
+    lines.extend(name + b": " + value.encode('ascii', errors='surrogateescape')
+                 for name, value in new_fields)
+    return b"\r\n".join(lines) + b"\r\n\r\n"
+
+def get_cache_directives(headers):
+    """
+    Returns the Cache-Control directives of a response as a dict,
+    e.g., {"max-age": "60", "no-store": None}.
+    """
+    directives = {}
+    for value in headers.get_all("Cache-Control", []):
+        for directive in value.split(","):
+            name, _, argument = directive.strip().partition("=")
+            if name:
+                directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+def parse_http_date(value):
+    """
+    Converts an HTTP date header value (e.g., "Sun, 06 Nov 1994 08:49:37 GMT") to a
+    Unix timestamp. Returns None if the value is missing or not a valid date.
+    """
+    if value is None:
+        return None
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    return mktime_tz(parsed)
+
+def get_freshness_lifetime(headers, directives):
+    """
+    Returns how many seconds after it was fetched a response may be served without
+    asking the web server. In order of preference this comes from Cache-Control
+    (s-maxage, then max-age), then Expires; no-cache or an invalid Expires means 0.
+    Without either, a page that has a Last-Modified date stays fresh for a fraction
+    of its age, as RFC 9111 section 4.2.2 allows, and other pages use DEFAULT_MAX_AGE.
+    """
+    if "no-cache" in directives:
+        return 0
+
+    for name in ("s-maxage", "max-age"):
+        value = directives.get(name)
+        if value is not None and value.isdigit():
+            return int(value)
+
+    date = parse_http_date(headers.get("Date")) or time.time()
+    if headers.get("Expires") is not None:
+        expires = parse_http_date(headers.get("Expires"))
+        if expires is None:
+            return 0  # e.g., "Expires: 0", which means already expired
+        return max(0, expires - date)
+
+    last_modified = parse_http_date(headers.get("Last-Modified"))
+    if last_modified is not None:
+        heuristic = (date - last_modified) * HEURISTIC_FRESHNESS_FRACTION
+        return min(max(0, heuristic), HEURISTIC_MAX_AGE)
+    return DEFAULT_MAX_AGE
+
+def build_conditional_headers(headers):
+    """
+    Builds If-None-Match / If-Modified-Since request headers from the validators
+    (ETag / Last-Modified) of a cached response, so the web server can answer
+    304 Not Modified instead of resending the whole page. Returns them as bytes,
+    ready to be inserted into the forwarded request (empty if there are none).
+    """
+    conditional_headers = b""
+    if headers.get("ETag"):
+        conditional_headers += b"If-None-Match: " + headers['ETag'].encode('utf-8') + b"\r\n"
+    if headers.get("Last-Modified"):
+        conditional_headers += b"If-Modified-Since: " + headers['Last-Modified'].encode('utf-8') + b"\r\n"
+    return conditional_headers
+
+def get_cache_metadata(status_code, headers):
+    """
+    Decides whether a response may be stored in the cache, and if so works out what
+    the cache needs to know about it later, so cache hits never parse headers again.
+    Returns (freshness_lifetime, conditional_headers), or None if the response must
+    not be stored. Only 200 OK responses are cached, and never ones marked
+    no-store/private or ones that set cookies, since this cache is shared between
+    clients. Responses that are never fresh and have no validator are not stored
+    either, as they could never be served from the cache.
+    """
+    if status_code != 200:
+        return None
+    directives = get_cache_directives(headers)
+    if "no-store" in directives or "private" in directives:
+        return None
+    if headers.get("Set-Cookie") is not None:
+        return None
+
+    freshness_lifetime = get_freshness_lifetime(headers, directives)
+    conditional_headers = build_conditional_headers(headers)
+    if freshness_lifetime <= 0 and not conditional_headers:
+        return None
+    return freshness_lifetime, conditional_headers
+
+def is_fresh(fetched_at, freshness_lifetime):
+    """
+    Returns True if a cached response can be served without asking the web server.
+    """
+    return time.time() - fetched_at < freshness_lifetime
+
+###############################################################################
+# FUNCTION TO BUILD A CACHE KEY
+###############################################################################
+
+def make_cache_key(url):
+    """
+    Returns the cache key (and cache file name) for a URL, given as bytes: a
+    32-character BLAKE2 hex digest. Unlike the URL itself it has a fixed length,
+    contains only safe characters, and different URLs do not collide in practice.
+    """
+    return hashlib.blake2b(url, digest_size=16).hexdigest()
 
 ###############################################################################
 # FUNCTION TO CHECK CACHED RESPONSES
@@ -52,166 +394,795 @@ if not os.path.exists(CACHE_DIR):
 def get_cached_content(cache_key):
     """
     Checks if the requested web page is stored in the cache.
-    Returns the cached data if found; otherwise, returns None.
+    The in-memory cache is checked first; on a miss the disk cache is used and the
+    response is loaded into memory for the next request.
+    Returns the cache entry if found; otherwise, returns None. An entry is the tuple
+    (content, fetched_at, freshness_lifetime, conditional_headers), where the last
+    two come from get_cache_metadata().
+    On disk, the time it was fetched is the file's modification time, and the
+    first line of the file holds the original URL (skipped when reading). The
+    response headers are parsed once when a file is loaded. Responses too large for
+    the memory cache are not loaded at all: only their headers are read, content is
+    None, and send_cached_response() streams them from the file instead.
     """
-    cache_path = os.path.join(CACHE_DIR, cache_key)
-    if os.path.exists(cache_path) and os.path.isfile(cache_path):
-        print(f"[DEBUG] Cache HIT for: {cache_key}")
-        with open(cache_path, "rb") as cached_file:
-            return cached_file.read()
-    print(f"[DEBUG] Cache MISS for: {cache_key}")
+    entry = get_from_memory(cache_key)
+    if entry is not None:
+        log.debug("Memory cache HIT for: %s", cache_key)
+        if cache_key in disk_cache_index:
+            disk_cache_index.move_to_end(cache_key)  # Keep hot pages on disk too
+        return entry
+
+    if cache_key in disk_cache_index:
+        disk_cache_index.move_to_end(cache_key)
+        try:
+            with open(os.path.join(CACHE_DIR, cache_key), "rb") as cached_file:
+                cached_file.readline()  # Original URL, kept only for debugging
+                file_info = os.fstat(cached_file.fileno())
+                fetched_at = file_info.st_mtime
+                if file_info.st_size - cached_file.tell() <= MEMORY_CACHE_MAX_BYTES:
+                    content = head = cached_file.read()
+                else:
+                    content, head = None, read_cached_head(cached_file)
+        except FileNotFoundError:
+            remove_from_disk_index(cache_key)  # Deleted outside the proxy
+        else:
+            metadata = get_cache_metadata(*parse_response_head(head))
+            if metadata is not None:
+                log.debug("Cache HIT for: %s", cache_key)
+                entry = (content, fetched_at) + metadata
+                store_in_memory(cache_key, entry)
+                return entry
+            # Stored under older caching rules and could never be served; delete it
+            delete_cache_entry(cache_key)
+    log.debug("Cache MISS for: %s", cache_key)
     return None
 
+def read_cached_head(cached_file):
+    """
+    Reads the status line and headers of the response in an open cache file, up to
+    and including the empty line that ends them, leaving the body unread.
+    """
+    head_lines = []
+    for line in cached_file:
+        head_lines.append(line)
+        if line == b"\r\n":
+            break
+    return b"".join(head_lines)
+
 ###############################################################################
-# FUNCTION TO SAVE CONTENT TO CACHE
+# FUNCTIONS TO SAVE CONTENT TO CACHE
 ###############################################################################
 
-def cache_content(cache_key, content):
+def open_cache_file(url):
+    """
+    Starts a new cache entry while its response is still downloading.
+    Returns (cache_file, tmp_path): a temporary ".part" file in the cache directory,
+    with the original URL (bytes) already written as its first line so hashed file
+    names can be traced back to the page they contain.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".part")
+    cache_file = os.fdopen(fd, "wb")
+    cache_file.write(url + b"\n")
+    return cache_file, tmp_path
+
+def commit_cache_file(cache_key, cache_file, tmp_path, content, metadata):
+    """
+    Finishes a cache entry once the whole response was received: the temporary file
+    is renamed into place, so other requests never read a partially written entry,
+    and the response is also stored in the in-memory cache, together with the
+    metadata from get_cache_metadata(), unless content is None (response too large
+    to be kept in memory).
+    """
+    cache_path = os.path.join(CACHE_DIR, cache_key)
+    size = cache_file.tell()
+    cache_file.close()
+    os.replace(tmp_path, cache_path)  # Atomic on both POSIX and Windows
+    add_to_disk_index(cache_key, size)
+    if content is not None:
+        store_in_memory(cache_key, (content, time.time()) + metadata)
+    log.debug("Cached content at: %s", cache_path)
+
+def discard_cache_file(cache_file, tmp_path):
+    """
+    Deletes an unfinished cache entry (download failed or client disconnected),
+    so partial responses never end up in the cache.
+    """
+    cache_file.close()
+    try:
+        os.unlink(tmp_path)
+    except FileNotFoundError:
+        pass
+
+def delete_cache_entry(cache_key):
+    """
+    Removes a response from both the in-memory and the disk cache, e.g. once the web
+    server no longer allows it to be cached.
+    """
+    global memory_cache_bytes
+    entry = memory_cache.pop(cache_key, None)
+    if entry is not None:
+        memory_cache_bytes -= len(entry[0])
+    remove_from_disk_index(cache_key)
+    try:
+        os.unlink(os.path.join(CACHE_DIR, cache_key))
+    except FileNotFoundError:
+        pass
+    log.debug("Deleted from cache: %s", cache_key)
+
+async def refresh_cache_entry(cache_key, url, entry, headers):
     """
-    Stores the web page data in a file within the cache directory.
+    Updates a cached response after the web server confirmed (304 Not Modified) that
+    it is still valid. The headers of the 304 are merged into the cached ones (see
+    update_response_head()), its freshness lifetime and validators are worked out
+    again from the result, and the cache file is rewritten with the new headers and
+    a new fetch time.
+    Returns the updated cache entry, or None if the new headers no longer allow the
+    response to be cached; the caller then serves the old copy and deletes it.
     """
+    content = entry[0]
     cache_path = os.path.join(CACHE_DIR, cache_key)
-    with open(cache_path, "wb") as f:
-        f.write(content)
-    print(f"[DEBUG] Cached content at: {cache_path}")
+    if content is not None:
+        head_end = content.find(b"\r\n\r\n") + 4
+        head, body = content[:head_end], content[head_end:]
+        new_head = update_response_head(head, headers)
+        metadata = get_cache_metadata(*parse_response_head(new_head))
+        if metadata is None:
+            return None
+        new_content = new_head + body
+        cache_file, tmp_path = open_cache_file(url)
+        cache_file.write(new_content)
+    else:
+        # Too large for memory: copy the body from the old cache file to the new one
+        # on a worker thread, so the event loop keeps serving other clients meanwhile
+        with open(cache_path, "rb") as cached_file:
+            cached_file.readline()  # Original URL
+            new_head = update_response_head(read_cached_head(cached_file), headers)
+            metadata = get_cache_metadata(*parse_response_head(new_head))
+            if metadata is None:
+                return None
+            new_content = None
+            cache_file, tmp_path = open_cache_file(url)
+            try:
+                cache_file.write(new_head)
+                await asyncio.to_thread(shutil.copyfileobj, cached_file, cache_file)
+            except BaseException:
+                discard_cache_file(cache_file, tmp_path)
+                raise
+
+    commit_cache_file(cache_key, cache_file, tmp_path, new_content, metadata)
+    log.debug("Revalidated cached content for: %s", cache_key)
+    return (new_content, time.time()) + metadata
+
+###############################################################################
+# FUNCTION TO TUNE SOCKET BUFFERS
+###############################################################################
+
+def tune_socket(sock):
+    """
+    Enlarges the kernel send/receive buffers of a TCP socket so large bodies move in
+    fewer, bigger system calls, and disables Nagle's algorithm (TCP_NODELAY) so small
+    responses are sent without delay.
+    The buffer sizes only shape the TCP window if they are set before the connection
+    is established: call this before connect() on outgoing sockets, and on the
+    listening socket before listen(), as accepted connections inherit them.
+    TCP_NODELAY is set again on every accepted socket, since not every OS passes it on.
+    """
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+###############################################################################
+# WEB SERVER CONNECTION POOL
+###############################################################################
+
+# Idle keep-alive connections to web servers, reused by later requests to the same
+# host so they skip the TCP handshake. Each host's deque is in the order connections
+# were released, and idle_connection_order holds all of them in that order too, so
+# the connection that has been idle longest (across all hosts) is always the first
+# one. Connections idle for longer than IDLE_CONNECTION_TIMEOUT are closed, as are
+# the longest idle ones once there are more than MAX_IDLE_CONNECTIONS, so unused
+# sockets (including ones the server has already closed) don't pile up.
+idle_connections = {}                  # hostname -> deque of idle sockets, oldest first
+idle_connection_order = OrderedDict()  # idle socket -> (hostname, time released), oldest first
+
+def close_oldest_idle_connection():
+    """
+    Closes the connection that has been idle the longest and removes it from the pool.
+    """
+    server_sock, (hostname, _) = idle_connection_order.popitem(last=False)
+    host_connections = idle_connections[hostname]
+    host_connections.popleft()  # Oldest for its host too
+    if not host_connections:
+        del idle_connections[hostname]
+    server_sock.close()
+
+def close_expired_connections():
+    """
+    Closes every connection that has been idle for longer than IDLE_CONNECTION_TIMEOUT.
+    """
+    expired_before = time.monotonic() - IDLE_CONNECTION_TIMEOUT
+    while idle_connection_order:
+        _, released_at = next(iter(idle_connection_order.values()))
+        if released_at > expired_before:
+            break
+        close_oldest_idle_connection()
+
+async def get_connection(hostname):
+    """
+    Returns (server_sock, reused): an idle pooled connection to hostname if one is
+    available, otherwise a newly connected non-blocking socket. The most recently
+    used connection is reused first, as it is the most likely to still be open.
+    """
+    close_expired_connections()
+    host_connections = idle_connections.get(hostname)
+    if host_connections:
+        server_sock = host_connections.pop()
+        if not host_connections:
+            del idle_connections[hostname]
+        del idle_connection_order[server_sock]
+        return server_sock, True
+
+    loop = asyncio.get_running_loop()
+    server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        server_sock.setblocking(False)
+        tune_socket(server_sock)
+        await asyncio.wait_for(loop.sock_connect(server_sock, (hostname, 80)), SERVER_TIMEOUT)
+    except BaseException:
+        server_sock.close()
+        raise
+    return server_sock, False
+
+def release_connection(hostname, server_sock):
+    """
+    Returns a connection whose response was read completely to the pool, or closes
+    it if the pool for hostname is already full. If the pool as a whole is then over
+    MAX_IDLE_CONNECTIONS, the longest idle connections are closed.
+    """
+    close_expired_connections()
+    host_connections = idle_connections.setdefault(hostname, deque())
+    if len(host_connections) >= MAX_IDLE_CONNECTIONS_PER_HOST:
+        server_sock.close()
+        return
+
+    host_connections.append(server_sock)
+    idle_connection_order[server_sock] = (hostname, time.monotonic())
+    while len(idle_connection_order) > MAX_IDLE_CONNECTIONS:
+        close_oldest_idle_connection()
+
+###############################################################################
+# FUNCTION TO READ A RESPONSE FROM THE WEB SERVER
+###############################################################################
+
+async def read_response(server_sock, on_head=None, on_data=None):
+    """
+    Reads exactly one HTTP response from a web server connection and passes it on
+    while it is still downloading, without keeping the body in memory.
+
+    The end of the response is found from its framing: no body (204/304), chunked
+    Transfer-Encoding, Content-Length, or otherwise the server closing the connection.
+    recv_into() fills a buffer taken from the shared buffer pool; only the header block
+    and the size line of the current chunk are ever held back, so memory use stays the
+    same no matter how large the response is.
+
+    on_head(status_code, headers) is called once the headers have arrived (with
+    (None, None) if they are malformed), and from then on the coroutine
+    on_data(data) is awaited with every piece of the response in order, starting
+    with the headers. on_data must use the data before returning, as its buffer is
+    reused. Each read waits at most SERVER_TIMEOUT seconds.
+
+    What on_data receives is the response as the client should see it: hop-by-hop
+    headers are replaced by "Connection: close" (see rewrite_response_head()) and
+    chunked bodies are passed on decoded, without their chunk framing.
+
+    Returns (received, complete, reusable). received is the number of bytes read from
+    the server; complete is False if the server closed the connection in the middle of
+    the response; reusable is True if the connection is HTTP/1.1 keep-alive and was
+    left at the start of the next response.
+    """
+    buffer = get_buffer()
+    try:
+        return await read_response_into(server_sock, buffer, on_head, on_data)
+    finally:
+        release_buffer(buffer)
+
+async def read_response_into(server_sock, buffer, on_head, on_data):
+    """
+    Does the work of read_response() using the given receive buffer.
+    """
+    loop = asyncio.get_running_loop()
+    view = memoryview(buffer)
+    pending = bytearray()  # Bytes received but not passed on yet
+    received = 0
+
+    async def receive():
+        # Reads the next piece of data into buffer; returns its size (0 once the server closed)
+        nonlocal received
+        count = await asyncio.wait_for(loop.sock_recv_into(server_sock, buffer), SERVER_TIMEOUT)
+        received += count
+        return count
+
+    async def pass_on(data):
+        if on_data is not None:
+            await on_data(data)
+
+    async def read_until(marker, start=0):
+        # Reads until marker appears in pending at or after start; returns its index, or -1 on close
+        while True:
+            index = pending.find(marker, start)
+            if index != -1:
+                return index
+            start = max(start, len(pending) - len(marker) + 1)
+            count = await receive()
+            if not count:
+                return -1
+            pending.extend(view[:count])
+
+    async def pass_on_bytes(length):
+        # Passes on the next length bytes, straight from the receive buffer where possible;
+        # returns False if the server closed first
+        while length:
+            if pending:
+                piece = bytes(pending[:length])
+                del pending[:len(piece)]
+            else:
+                count = await receive()
+                if not count:
+                    return False
+                if count > length:
+                    pending.extend(view[length:count])  # Belongs to whatever follows
+                    count = length
+                piece = view[:count]
+            await pass_on(piece)
+            length -= len(piece)
+        return True
+
+    async def pass_on_until_close():
+        if pending:
+            await pass_on(bytes(pending))
+            pending.clear()
+        while True:
+            count = await receive()
+            if not count:
+                return
+            await pass_on(view[:count])
+
+    # 1) Status line and headers. Interim 1xx responses (e.g., 103 Early Hints) come
+    # before the final response on the same connection; they are read and skipped, and
+    # only the final response is passed on. 101 Switching Protocols is final, but the
+    # proxy never asks for it.
+    while True:
+        header_end = await read_until(b"\r\n\r\n")
+        if header_end == -1:
+            if pending:
+                # Pass through the incomplete response as-is
+                if on_head is not None:
+                    on_head(None, None)
+                await pass_on(bytes(pending))
+            return received, False, False
+        head = bytes(pending[:header_end + 4])
+        del pending[:header_end + 4]
+
+        status_code, headers = parse_response_head(head)
+        if status_code is None or not 100 <= status_code < 200 or status_code == 101:
+            break
+        log.debug("Skipped interim %s response.", status_code)
+
+    if on_head is not None:
+        on_head(status_code, headers)
+    if status_code is None:
+        # Not a valid HTTP response; pass through whatever the server sends
+        await pass_on(head)
+        await pass_on_until_close()
+        return received, True, False
+    await pass_on(rewrite_response_head(head, headers))
+
+    connection = (headers.get("Connection") or "").lower()
+    reusable = (head.startswith(b"HTTP/1.1") and "close" not in connection
+                and status_code != 101)  # After 101 the connection no longer speaks HTTP
+    transfer_encoding = (headers.get("Transfer-Encoding") or "").lower()
+    content_length = (headers.get("Content-Length") or "").strip()
+
+    # 2) Body, according to the response's framing
+    if status_code in (101, 204, 304):
+        pass
+
+    elif "chunked" in transfer_encoding:
+        # Each chunk is "<hex size>[;ext]\r\n<data>\r\n"; a zero-size chunk ends the body,
+        # followed by optional trailer lines and an empty line. Only the chunk data is
+        # passed on; the size lines, line breaks and trailers are dropped.
+        while True:
+            line_end = await read_until(b"\r\n")
+            if line_end == -1:
+                return received, False, False
+            size_field = bytes(pending[:line_end]).split(b";", 1)[0].strip()
+            try:
+                chunk_size = int(size_field, 16)
+            except ValueError:
+                return received, False, False
+            if chunk_size == 0:
+                trailer_end = await read_until(b"\r\n\r\n", line_end)
+                if trailer_end == -1:
+                    return received, False, False
+                del pending[:trailer_end + 4]
+                break
+            del pending[:line_end + 2]
+            if not await pass_on_bytes(chunk_size):
+                return received, False, False
+            if await read_until(b"\r\n") != 0:
+                return received, False, False  # Closed early, or data longer than its size
+            del pending[:2]
+
+    elif content_length.isdigit():
+        if not await pass_on_bytes(int(content_length)):
+            return received, False, False
+
+    else:
+        # No framing information: the body ends when the server closes the connection
+        await pass_on_until_close()
+        return received, True, False
+
+    # Extra bytes after the response mean the connection is out of sync; don't reuse it
+    if pending:
+        reusable = False
+    return received, True, reusable
+
+###############################################################################
+# FUNCTION TO FETCH A PAGE FROM THE WEB SERVER
+###############################################################################
+
+# The forwarded request is the same for every page apart from the path, hostname and
+# conditional headers, so its fixed parts are kept as ready-made bytes and only joined
+# around those values, instead of formatting and encoding the whole request each time.
+FORWARD_REQUEST_START = b"GET "
+FORWARD_REQUEST_HOST = b" HTTP/1.1\r\nHost: "
+FORWARD_REQUEST_HEADERS = (
+    b"\r\n"
+    b"User-Agent: CSE310-Proxy\r\n"
+    b"Accept: */*\r\n"
+    b"Accept-Encoding: identity\r\n"
+)
+FORWARD_REQUEST_END = b"Connection: keep-alive\r\n\r\n"
+
+async def fetch_from_server(hostname, path, extra_headers=b"", on_head=None, on_data=None):
+    """
+    Sends a GET request for path to hostname (port 80) and returns
+    (received, complete) as described in read_response(), which also explains
+    the on_head/on_data streaming callbacks. extra_headers holds additional request
+    header lines as bytes, each ending in "\r\n" (used for conditional requests).
+
+    Requests use HTTP/1.1 keep-alive; the connection is returned to the pool after
+    the response is read. A pooled connection the server has meanwhile closed is
+    discarded and the request is retried on another connection, as long as nothing
+    has been streamed to the callbacks yet.
+    """
+    streamed = False
+
+    def on_head_once(status_code, headers):
+        nonlocal streamed
+        streamed = True
+        if on_head is not None:
+            on_head(status_code, headers)
+
+    forward_msg = b"".join([
+        FORWARD_REQUEST_START, path.encode('ascii'),
+        FORWARD_REQUEST_HOST, hostname.encode('ascii'),
+        FORWARD_REQUEST_HEADERS, extra_headers,
+        FORWARD_REQUEST_END,
+    ])
+
+    loop = asyncio.get_running_loop()
+    while True:
+        server_sock, reused = await get_connection(hostname)
+        try:
+            await loop.sock_sendall(server_sock, forward_msg)
+            log.debug("Request forwarded to remote server (reused connection: %s).", reused)
+            received, complete, reusable = await read_response(server_sock, on_head_once, on_data)
+        except OSError:
+            server_sock.close()
+            if reused and not streamed:
+                continue  # Stale pooled connection; try again
+            raise
+        except BaseException:
+            server_sock.close()
+            raise
+
+        if not received and reused:
+            server_sock.close()
+            continue  # Server closed the idle connection before answering; try again
+
+        if reusable:
+            release_connection(hostname, server_sock)
+        else:
+            server_sock.close()
+        return received, complete
+
+###############################################################################
+# FUNCTION TO SEND DATA TO THE CLIENT
+###############################################################################
+
+async def send_to_client(client_socket, data):
+    """
+    Sends data to the client, giving up after CLIENT_TIMEOUT seconds if the client
+    stops reading.
+    """
+    loop = asyncio.get_running_loop()
+    await asyncio.wait_for(loop.sock_sendall(client_socket, data), CLIENT_TIMEOUT)
+
+async def send_cached_response(client_socket, cache_key, content):
+    """
+    Sends a cached response to the client: content itself if it was loaded into
+    memory, otherwise the response is streamed from its cache file in
+    RECV_BUFFER_SIZE pieces through a pooled buffer, so large responses are never
+    held in memory as a whole.
+    """
+    if content is not None:
+        await send_to_client(client_socket, content)
+        return
+
+    buffer = get_buffer()
+    try:
+        view = memoryview(buffer)
+        with open(os.path.join(CACHE_DIR, cache_key), "rb") as cached_file:
+            cached_file.readline()  # Original URL
+            while True:
+                count = cached_file.readinto(buffer)
+                if not count:
+                    return
+                await send_to_client(client_socket, view[:count])
+    finally:
+        release_buffer(buffer)
 
 ###############################################################################
 # FUNCTION TO HANDLE CLIENT REQUESTS
 ###############################################################################
 
-def handle_client(client_socket):
+async def handle_client(client_socket):
     """
     Processes requests from a web browser:
       1) Reads the HTTP request and extracts the URL.
-      2) If the resource is cached, sends it back immediately.
-      3) Otherwise, fetches it from the remote server, caches it, and returns it.
+      2) If the resource is cached and still fresh, sends it back immediately.
+      3) If the cached copy is stale, revalidates it with the remote server
+         (conditional GET) and serves it again on 304 Not Modified.
+      4) Otherwise, fetches it from the remote server, streaming it to the client and
+         into the cache (if allowed) as it arrives.
     Only supports HTTP GET requests.
+
+    Runs as one task on the event loop; it only yields while waiting on a socket.
+    Cache files are read and written directly, as they are usually small and in the
+    OS page cache, and hot pages are served from the in-memory cache anyway.
     """
+    loop = asyncio.get_running_loop()
     try:
-        print("[DEBUG] Waiting to receive client request...")
-        request_data = client_socket.recv(4096)
+        log.debug("Waiting to receive client request...")
+        request_data = await asyncio.wait_for(loop.sock_recv(client_socket, 4096), CLIENT_TIMEOUT)
 
         if not request_data:
-            print("[ERROR] Received empty request data.")
+            log.error("Received empty request data.")
             return
 
-        # Decode the received request to a string
-        request_text = request_data.decode('utf-8', errors='ignore')
-        print(f"[DEBUG] Decoded request:\n{request_text}")
+        # Only decode the whole request when debug output is actually enabled
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Decoded request:\n%s", request_data.decode('utf-8', errors='ignore'))
 
-        # Extract the first line (e.g., "GET http://example.com/page.html HTTP/1.1")
-        lines = request_text.split('\r\n')
-        if len(lines) < 1 or not lines[0]:
-            print("[ERROR] Malformed request: No request line found.")
+        # Extract the first line (e.g., b"GET http://example.com/page.html HTTP/1.1") straight
+        # from the bytes; the rest of the request is never decoded or split into lines
+        line_end = request_data.find(b"\r\n")
+        first_line = request_data[:line_end] if line_end != -1 else request_data
+        if not first_line:
+            log.error("Malformed request: No request line found.")
             return
 
-        request_line = lines[0].split()
+        request_line = first_line.split(None, 2)
         if len(request_line) < 2:
-            print(f"[ERROR] Invalid request line: {request_line}")
+            log.error("Invalid request line: %s", request_line)
             return
 
-        method = request_line[0].upper()  # e.g., GET
-        url = request_line[1]            # e.g., http://example.com/page.html
-        print(f"[DEBUG] Parsed request - Method: {method}, URL: {url}")
+        method = request_line[0].upper()  # e.g., b"GET"
+        url = request_line[1]  # e.g., b"http://example.com/page.html"; kept as bytes
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Parsed request - Method: %s, URL: %s",
+                      method.decode('ascii', errors='replace'), url.decode('ascii', errors='replace'))
 
         # Only supports GET
-        if method != 'GET':
-            print(f"[ERROR] Only GET is supported. Received method: {method}")
+        if method != b'GET':
+            log.error("Only GET is supported. Received method: %s", method.decode('ascii', errors='replace'))
             return
 
         # Check for HTTPS
-        if url.startswith("https://"):
-            print("[ERROR] HTTPS requests are not supported by this proxy.")
+        if url.startswith(b"https://"):
+            log.error("HTTPS requests are not supported by this proxy.")
             return
 
         # If the URL is relative (like "/index.html"), we can't handle it in this proxy
-        if url.startswith('/'):
-            print("[ERROR] Relative URL detected, cannot process request.")
+        if url.startswith(b"/"):
+            log.error("Relative URL detected, cannot process request.")
             return
 
         # Strip "http://"
-        if url.startswith("http://"):
-            url = url[len("http://"):]
+        if url.startswith(b"http://"):
+            url = url[len(b"http://"):]
 
-        # Split into hostname and path
-        parts = url.split('/', 1)
-        hostname = parts[0]
-        path = "/" + parts[1] if len(parts) > 1 else "/"
+        # Split into hostname and path; only these two short pieces are decoded, to
+        # build the request sent to the web server
+        slash = url.find(b"/")
+        if slash == -1:
+            hostname, path = url.decode('ascii'), "/"
+        else:
+            hostname, path = url[:slash].decode('ascii'), url[slash:].decode('ascii')
 
-        print(f"[DEBUG] Extracted hostname: {hostname}, Path: {path}")
+        log.debug("Extracted hostname: %s, Path: %s", hostname, path)
 
         # Create a unique cache key
-        cache_key = url.replace('/', '_')
+        cache_key = make_cache_key(url)
 
-        # Check if content is cached
-        cached_data = get_cached_content(cache_key)
-        if cached_data:
-            print(f"[DEBUG] Serving cached content for: {url}")
-            client_socket.sendall(cached_data)
-            return
+        # Check if content is cached and still fresh
+        cached = get_cached_content(cache_key)
+        conditional_headers = b""
+        if cached is not None:
+            cached_data, fetched_at, freshness_lifetime, conditional_headers = cached
+            if is_fresh(fetched_at, freshness_lifetime):
+                log.debug("Serving cached content for: %s%s", hostname, path)
+                await send_cached_response(client_socket, cache_key, cached_data)
+                return
+
+            # Stale: ask the web server whether our copy is still valid
+            log.debug("Cached content is stale, revalidating with %s...", hostname)
+        else:
+            log.debug("No cache found, forwarding request to %s...", hostname)
+
+        # Stream the response to the client and into a new cache file while it downloads,
+        # instead of waiting for the whole response first. A copy is only collected in
+        # memory for the in-memory cache, and only while it still fits in there.
+        forward_to_client = True
+        cache_file, tmp_path = None, None
+        cache_metadata = None
+        memory_copy = None
+        not_modified_headers = None
+
+        def on_head(status_code, headers):
+            nonlocal forward_to_client, cache_file, tmp_path, cache_metadata, memory_copy
+            nonlocal not_modified_headers
+            if cached is not None and status_code == 304:
+                forward_to_client = False  # The cached copy is sent instead, below
+                not_modified_headers = headers
+                return
+            cache_metadata = get_cache_metadata(status_code, headers)
+            if cache_metadata is not None:
+                cache_file, tmp_path = open_cache_file(url)
+                content_length = (headers.get("Content-Length") or "").strip()
+                if not content_length.isdigit() or int(content_length) <= MEMORY_CACHE_MAX_BYTES:
+                    memory_copy = bytearray()
+            else:
+                log.debug("Response not cacheable (status %s), not caching.", status_code)
+                if cached is not None:
+                    delete_cache_entry(cache_key)  # Replaced by a response that may not be cached
 
-        # Otherwise, fetch from the web server
-        print(f"[DEBUG] No cache found, forwarding request to {hostname}...")
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_sock:
-            server_sock.settimeout(10)  # 10-second timeout
-            server_sock.connect((hostname, 80))
-
-            forward_msg = (
-                f"GET {path} HTTP/1.0\r\n"
-                f"Host: {hostname}\r\n"
-                "User-Agent: CSE310-Proxy\r\n"
-                "Accept: */*\r\n"
-                "Accept-Encoding: identity\r\n"
-                "Connection: close\r\n"
-                "\r\n"
-            )
-            server_sock.sendall(forward_msg.encode('utf-8'))
-            print("[DEBUG] Request forwarded to remote server.")
-
-            response_data = server_sock.recv(4096)  # Receive response in a single call
+        async def on_data(data):
+            nonlocal memory_copy
+            if forward_to_client:
+                await send_to_client(client_socket, data)
+            if cache_file is not None:
+                cache_file.write(data)
+            if memory_copy is not None:
+                if len(memory_copy) + len(data) > MEMORY_CACHE_MAX_BYTES:
+                    memory_copy = None  # Too large for the memory cache; keep it on disk only
+                else:
+                    memory_copy += data
+
+        try:
+            received, complete = await fetch_from_server(
+                hostname, path, conditional_headers, on_head, on_data)
+        except BaseException:
+            if cache_file is not None:
+                discard_cache_file(cache_file, tmp_path)
+            raise
 
         # If the server responded with nothing, treat it as a 404
-        if not response_data:
-            print(f"[ERROR] Empty response received from {hostname}")
+        if not received:
+            log.error("Empty response received from %s", hostname)
+            return
+
+        # 304 Not Modified: the cached copy is still valid, serve it
+        if not forward_to_client:
+            refreshed = await refresh_cache_entry(cache_key, url, cached, not_modified_headers)
+            log.debug("Serving revalidated cached content for: %s%s", hostname, path)
+            if refreshed is not None:
+                await send_cached_response(client_socket, cache_key, refreshed[0])
+                return
+            # The 304 no longer allows caching: serve the old copy one last time
+            try:
+                await send_cached_response(client_socket, cache_key, cached_data)
+            finally:
+                delete_cache_entry(cache_key)
             return
 
-        # Cache the response
-        cache_content(cache_key, response_data)
+        log.debug("Relayed %s bytes from %s to client.", received, hostname)
 
-        # Send the server's response back to the client
-        print(f"[DEBUG] Received {len(response_data)} bytes from {hostname}, sending to client...")
-        client_socket.sendall(response_data)
+        # Keep the cache entry only if the whole response arrived
+        if cache_file is not None:
+            if complete:
+                content = bytes(memory_copy) if memory_copy is not None else None
+                commit_cache_file(cache_key, cache_file, tmp_path, content, cache_metadata)
+            else:
+                log.error("Incomplete response from %s, not caching.", hostname)
+                discard_cache_file(cache_file, tmp_path)
 
-    except socket.timeout:
-        print("[ERROR] Connection timed out while handling request.")
+    except asyncio.TimeoutError:
+        log.error("Connection timed out while handling request.")
     except Exception as e:
-        print(f"[ERROR] Exception while handling request: {e}")
+        log.error("Exception while handling request: %s", e)
     finally:
         client_socket.close()
-        print("[DEBUG] Closed client connection.")
+        log.debug("Closed client connection.")
 
 ###############################################################################
 # FUNCTION TO START THE PROXY SERVER
 ###############################################################################
 
-def start_proxy_server():
+async def serve_forever():
     """
-    Starts the proxy server on the specified HOST and PORT.
+    Accepts client connections on the event loop and handles each one in its own
+    task, so a slow upstream fetch does not block other clients.
+    At most MAX_CLIENTS are handled at once, which also bounds the sockets, receive
+    buffers and memory in use. Errors while accepting a connection are logged and
+    the proxy keeps running.
     """
+    loop = asyncio.get_running_loop()
+    client_tasks = set()  # Keeps running tasks referenced until they finish
+    client_slots = asyncio.Semaphore(MAX_CLIENTS)
+
+    def finish_client(task):
+        client_tasks.discard(task)
+        client_slots.release()
+
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as proxy_sock:
         proxy_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         proxy_sock.bind((HOST, PORT))
-        proxy_sock.listen(5)
-        print(f"[INFO] Proxy server listening on http://{HOST}:{PORT}")
+        tune_socket(proxy_sock)  # Accepted connections inherit the buffer sizes
+        proxy_sock.listen(LISTEN_BACKLOG)
+        proxy_sock.setblocking(False)
+        log.info("Proxy server listening on http://%s:%s", HOST, PORT)
 
         while True:
-            client_conn, client_addr = proxy_sock.accept()
-            print(f"[INFO] Connection established with {client_addr}")
-            handle_client(client_conn)
+            await client_slots.acquire()  # Waits while MAX_CLIENTS are being handled
+            try:
+                client_conn, client_addr = await loop.sock_accept(proxy_sock)
+            except OSError as e:
+                # e.g., EMFILE when out of file descriptors; wait for clients to finish
+                client_slots.release()
+                log.error("Failed to accept connection: %s", e)
+                await asyncio.sleep(ACCEPT_RETRY_DELAY)
+                continue
+
+            log.info("Connection established with %s", client_addr)
+            try:
+                client_conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError as e:
+                # The client may already have reset the connection
+                client_slots.release()
+                client_conn.close()
+                log.error("Failed to set up connection with %s: %s", client_addr, e)
+                continue
+
+            task = asyncio.create_task(handle_client(client_conn))
+            client_tasks.add(task)
+            task.add_done_callback(finish_client)
+
+def start_proxy_server():
+    """
+    Starts the proxy server on the specified HOST and PORT, using uvloop's event
+    loop if it is installed and the standard asyncio loop otherwise.
+    """
+    if uvloop is not None:
+        uvloop.run(serve_forever())
+    else:
+        asyncio.run(serve_forever())
 
 ###############################################################################
 # MAIN EXECUTION: START THE SERVER
 ###############################################################################
 
 if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format="[%(levelname)s] %(message)s")
     start_proxy_server()
@@ -6,7 +6,7 @@ processes them, and responds with the requested file if available. If the file d
 the server returns a "404 Not Found" response.
 
 Features:
-- Handles one request at a time (single-threaded).
+- Handles multiple clients concurrently using a bounded thread pool.
 - Supports HTML, text, and image files (JPEG, PNG).
 - Responds with a valid HTTP header and content.
 - Returns a 404 error if the file is missing.
@@ -19,12 +19,189 @@ Usage:
 """
 
 import socket  # Import socket module to handle network communication
+import logging # Import logging to print messages (debug output is off by default)
 import os      # Import os module to interact with the file system
-import mimetypes  # Import mimetypes to determine file content types (MIME types)
+import mimetypes  # Import mimetypes for its table of file content types (MIME types)
+import stat       # Import stat to check whether a path is a regular file
+import queue      # Import queue for the thread-safe pool of receive buffers
+import functools  # Import functools for the LRU cache of small files
+import time       # Import time to pause briefly after a failed accept()
+from concurrent.futures import ThreadPoolExecutor  # Thread pool to serve clients concurrently
 
 # Server Configuration
 HOST = '127.0.0.1'  # The server listens on localhost (only accessible from this machine)
 PORT = 6789         # The port number clients must use to connect
+MAX_WORKERS = 64    # Maximum number of clients handled at the same time
+CLIENT_TIMEOUT = 30 # Seconds to wait on a silent client before giving up
+ACCEPT_RETRY_DELAY = 0.1  # Seconds to pause after accept() fails (e.g., out of file descriptors)
+SOCKET_BUFFER_SIZE = 512 * 1024  # Kernel send/receive buffer size for client sockets
+MAX_HEADER_SIZE = 65536  # Stop reading a request once its headers grow past this many bytes
+RECV_BUFFER_SIZE = 4096  # Size of the buffer used to read requests from clients
+BUFFER_POOL_SIZE = 16    # Receive buffers kept for reuse (more are created on demand, then dropped)
+SMALL_FILE_SIZE = 65536  # Files up to this size are cached in memory and sent with one sendmsg() call
+FILE_CACHE_SIZE = 256    # Maximum number of small files kept in the in-memory LRU cache
+CORK_AVAILABLE = hasattr(socket, "TCP_CORK")  # TCP_CORK is Linux-only
+SENDMSG_AVAILABLE = hasattr(socket.socket, "sendmsg")  # sendmsg() is POSIX-only
+
+# Content types by file extension, looked up once here instead of on every request
+MIME_TYPES = {ext: content_type.encode() for ext, content_type in mimetypes.types_map.items()}
+DEFAULT_CONTENT_TYPE = b"application/octet-stream"
+
+# Pre-encoded responses, so nothing is formatted or encoded per request. The 200 OK
+# header is split around Content-Length: one prefix per content type, one shared suffix.
+RESPONSE_HEADER_PREFIXES = {
+    content_type: b"HTTP/1.1 200 OK\r\nContent-Type: " + content_type + b"\r\nContent-Length: "
+    for content_type in set(MIME_TYPES.values()) | {DEFAULT_CONTENT_TYPE}
+}
+RESPONSE_HEADER_SUFFIX = b"\r\nConnection: close\r\n\r\n"
+NOT_FOUND_RESPONSE = (
+    b"HTTP/1.1 404 Not Found\r\n"
+    b"Content-Type: text/html\r\n"
+    b"Connection: close\r\n\r\n"
+    b"<html><body><h1>404 Not Found</h1></body></html>"
+)
+
+LOG_LEVEL = logging.INFO  # Set to logging.DEBUG to trace every request
+
+log = logging.getLogger("webserver")
+
+###############################################################################
+# FUNCTION TO TUNE SOCKET BUFFERS
+###############################################################################
+
+def tune_socket(sock):
+    """
+    Enlarges the kernel send/receive buffers of a TCP socket so large bodies move in
+    fewer, bigger system calls, and disables Nagle's algorithm (TCP_NODELAY) so small
+    responses are sent without delay.
+    The buffer sizes only shape the TCP window if they are set before the connection
+    is established, so this is called on the listening socket before listen();
+    accepted connections inherit them. TCP_NODELAY is set again on every accepted
+    socket, since not every OS passes it on.
+    """
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+###############################################################################
+# FUNCTION TO SEND SEVERAL BUFFERS AT ONCE
+###############################################################################
+
+def send_parts(client_socket, parts):
+    """
+    Sends a list of byte buffers (e.g., [header, body]) without joining them.
+
+    sendmsg() passes all buffers to the kernel in one scatter-gather (writev-style)
+    system call, so the body is never copied just to prepend the header. Partial
+    sends are resumed from where they stopped. Platforms without sendmsg() fall back
+    to one sendall() per buffer.
+    """
+    if not SENDMSG_AVAILABLE:
+        for part in parts:
+            client_socket.sendall(part)
+        return
+
+    views = [memoryview(part) for part in parts]
+    while views:
+        sent = client_socket.sendmsg(views)
+        # Drop the buffers that were sent completely and trim the partially sent one
+        while views and sent >= len(views[0]):
+            sent -= len(views.pop(0))
+        if views and sent:
+            views[0] = views[0][sent:]
+
+###############################################################################
+# FILE TYPES AND IN-MEMORY CACHE OF SMALL FILES
+###############################################################################
+
+def get_content_type(filename):
+    """
+    Returns the MIME type of a file (as bytes) from its extension, using the
+    precomputed MIME_TYPES table.
+    """
+    return MIME_TYPES.get(os.path.splitext(filename)[1].lower(), DEFAULT_CONTENT_TYPE)
+
+@functools.lru_cache(maxsize=FILE_CACHE_SIZE)
+def load_small_file(filename, mtime_ns, size):
+    """
+    Returns the content of a small file, keeping recently used files in memory.
+    The modification time and size are part of the cache key, so a file that is
+    edited on disk is read again instead of being served stale.
+    Uses os.open()/os.read() directly, skipping Python's buffered file object.
+    """
+    fd = os.open(filename, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+###############################################################################
+# RECEIVE BUFFER POOL
+###############################################################################
+
+# Receive buffers are shared between requests instead of being allocated for every
+# one. Worker threads take a buffer from the pool, fill it with recv_into(), and put
+# it back when done. Only the bytes filled by the current recv_into() call are ever
+# read, so old contents left in a reused buffer don't matter.
+buffer_pool = queue.SimpleQueue()
+for _ in range(BUFFER_POOL_SIZE):
+    buffer_pool.put(bytearray(RECV_BUFFER_SIZE))
+
+def get_buffer():
+    """
+    Takes a receive buffer from the pool, or allocates a new one if all are in use.
+    """
+    try:
+        return buffer_pool.get_nowait()
+    except queue.Empty:
+        return bytearray(RECV_BUFFER_SIZE)
+
+def release_buffer(buffer):
+    """
+    Returns a receive buffer to the pool. The caller must not keep any reference to it.
+    Buffers allocated during a burst are dropped once the pool is full again, so the
+    pool never holds more than BUFFER_POOL_SIZE buffers.
+    """
+    if buffer_pool.qsize() < BUFFER_POOL_SIZE:
+        buffer_pool.put(buffer)
+
+###############################################################################
+# FUNCTION TO RECEIVE A FULL REQUEST HEADER
+###############################################################################
+
+def receive_request(client_socket):
+    """
+    Reads from the client until the end of the HTTP headers ("\r\n\r\n") is seen,
+    or until the client closes the connection (or MAX_HEADER_SIZE is exceeded).
+
+    Data is read with recv_into() into a pooled receive buffer and accumulated in a
+    single bytearray. Each search for the terminator starts just before the newly
+    received bytes so earlier data is never re-scanned.
+    Returns the bytes received up to and including the blank line.
+    """
+    recv_buffer = get_buffer()
+    recv_view = memoryview(recv_buffer)
+    buffer = bytearray()
+    last_scan = 0  # Offset where the next search for "\r\n\r\n" starts
+
+    try:
+        while True:
+            received = client_socket.recv_into(recv_buffer)
+            if not received:
+                return bytes(buffer)  # Client closed the connection before finishing the headers
+
+            buffer += recv_view[:received]
+            header_end = buffer.find(b"\r\n\r\n", last_scan)
+            if header_end != -1:
+                return bytes(buffer[:header_end + 4])
+
+            if len(buffer) > MAX_HEADER_SIZE:
+                return bytes(buffer)  # Oversized header; let the caller parse what arrived
+
+            # The terminator may be split across two reads, so back up 3 bytes
+            last_scan = max(0, len(buffer) - 3)
+    finally:
+        release_buffer(recv_buffer)
 
 ###############################################################################
 # FUNCTION TO HANDLE CLIENT REQUESTS
@@ -42,93 +219,111 @@ def handle_client(client_socket):
 
     client_socket: The network connection between the server and the client (browser).
     """
-    print("\n[DEBUG] Handling new client request...")
+    log.debug("Handling new client request...")
 
     try:
-        # Receive the HTTP request from the client (up to 1024 bytes)
-        request = client_socket.recv(1024)
-        print(f"[DEBUG] Raw request received (bytes): {request}")
-
-        # Decode the request to a human-readable format (UTF-8)
-        try:
-            request_text = request.decode('utf-8')  # Convert bytes to string
-            print(f"[DEBUG] Decoded request text:\n{request_text}")
-        except UnicodeDecodeError:
-            print("[ERROR] Received non-UTF-8 request. Closing connection.")
-            client_socket.close()  # Close connection if request is unreadable
-            return
-
-        # Split the request into individual lines
-        request_lines = request_text.split("\r\n")
+        # Receive the HTTP request from the client (request line + headers)
+        request = receive_request(client_socket)
 
         # Check if the request contains data
-        if len(request_lines) == 0:
-            print("[ERROR] Received empty request. Ignoring.")
+        if not request:
+            log.error("Received empty request. Ignoring.")
             return  # Ignore empty request
 
-        # Extract the first line (request line) and split it into components
-        first_line = request_lines[0].split()  # Example: ["GET", "/index.html", "HTTP/1.1"]
+        # Only decode the whole request when debug output is actually enabled
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Raw request received (bytes): %s", request)
+            log.debug("Decoded request text:\n%s", request.decode('utf-8', errors='replace'))
+
+        # Extract the first line (request line) straight from the bytes and split it into
+        # components; the rest of the request is never decoded or split into lines
+        line_end = request.find(b"\r\n")
+        request_line = request[:line_end] if line_end != -1 else request
+        first_line = request_line.split(None, 2)  # Example: [b"GET", b"/index.html", b"HTTP/1.1"]
 
         # Ensure the request line has at least two parts and is a GET request
-        if len(first_line) < 2 or first_line[0] != "GET":
-            print(f"[ERROR] Invalid request format: {first_line}")
+        if len(first_line) < 2 or first_line[0] != b"GET":
+            log.error("Invalid request format: %s", first_line)
             return  # Ignore invalid requests
 
-        print(f"[DEBUG] Parsed HTTP method: {first_line[0]}")
-        print(f"[DEBUG] Requested file: {first_line[1]}")
+        # Decode only the requested path (UTF-8)
+        try:
+            requested_path = first_line[1].decode('utf-8')
+        except UnicodeDecodeError:
+            log.error("Received non-UTF-8 request path. Closing connection.")
+            return
+
+        log.debug("Parsed HTTP method: GET")
+        log.debug("Requested file: %s", requested_path)
 
         # Extract the filename from the request (remove the leading "/")
-        filename = first_line[1].lstrip("/")
+        filename = requested_path.lstrip("/")
 
         # If the client requests "/", assume there is no default index file and return 404
         if filename == "":
-            print("[DEBUG] Root '/' requested. No default file specified, returning 404.")
+            log.debug("Root '/' requested. No default file specified, returning 404.")
             filename = "nonexistentfile"  # Assign a filename that does not exist
 
-        # Check if the requested file exists
-        if os.path.exists(filename) and os.path.isfile(filename):
-            print(f"[DEBUG] File found: {filename}")
+        # Check if the requested file exists: a single stat() call, with a missing file
+        # reported by the exception instead of separate exists()/isfile() checks
+        try:
+            file_stat = os.stat(filename)
+        except OSError:
+            file_stat = None
 
-            # Determine the file's MIME type using the mimetypes module
-            content_type, _ = mimetypes.guess_type(filename)
-            content_type = content_type or "application/octet-stream"  # Default MIME type
-            print(f"[DEBUG] Detected MIME type: {content_type}")
+        if file_stat is not None and stat.S_ISREG(file_stat.st_mode):
+            log.debug("File found: %s", filename)
 
-            # Open the file in binary mode and read its content
-            with open(filename, "rb") as file:
-                file_data = file.read()
+            # Determine the file's MIME type from its extension
+            content_type = get_content_type(filename)
+            log.debug("Detected MIME type: %s", content_type)
 
-            print(f"[DEBUG] File size: {len(file_data)} bytes")
+            file_size = file_stat.st_size
+            log.debug("File size: %s bytes", file_size)
 
             # Construct the HTTP response header for a successful request (200 OK)
-            response_header = (
-                "HTTP/1.1 200 OK\r\n"
-                f"Content-Type: {content_type}\r\n"
-                f"Content-Length: {len(file_data)}\r\n"
-                "Connection: close\r\n\r\n"
-            ).encode()
+            response_header = b"".join((
+                RESPONSE_HEADER_PREFIXES[content_type],
+                str(file_size).encode(),
+                RESPONSE_HEADER_SUFFIX,
+            ))
 
-            print("[DEBUG] Sending 200 OK response with file content.")
-            client_socket.sendall(response_header + file_data)  # Send the response
+            log.debug("Sending 200 OK response with file content.")
 
-        else:
-            print(f"[ERROR] File not found: {filename}. Sending 404 response.")
+            # Small files: served from the in-memory cache, header + body in a single sendmsg()
+            if file_size <= SMALL_FILE_SIZE:
+                file_data = load_small_file(filename, file_stat.st_mtime_ns, file_size)
+                send_parts(client_socket, [response_header, file_data])
+                return
 
-            # Construct and send the 404 Not Found response
-            error_response = (
-                "HTTP/1.1 404 Not Found\r\n"
-                "Content-Type: text/html\r\n"
-                "Connection: close\r\n\r\n"
-                "<html><body><h1>404 Not Found</h1></body></html>"
-            ).encode()
+            # Large files are never read into Python memory
+            with open(filename, "rb") as file:
+                # On Linux, TCP_CORK holds back partial packets so the header and the start of
+                # the file go out together instead of the header in its own small packet
+                if CORK_AVAILABLE:
+                    client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1)
+
+                client_socket.sendall(response_header)  # Send the header first
+
+                # Send the body with sendfile(2) so the kernel copies it straight from the file
+                # to the socket. socket.sendfile() falls back to plain send() on platforms
+                # without sendfile support. Sending at most file_size bytes keeps the body
+                # consistent with Content-Length even if the file grows meanwhile.
+                client_socket.sendfile(file, 0, file_size)
+
+                if CORK_AVAILABLE:
+                    client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 0)  # Flush
 
-            client_socket.sendall(error_response)  # Send error response to client
+        else:
+            log.error("File not found: %s. Sending 404 response.", filename)
+
+            client_socket.sendall(NOT_FOUND_RESPONSE)  # Send error response to client
 
     except Exception as e:
-        print(f"[ERROR] Exception while handling request: {e}")
+        log.error("Exception while handling request: %s", e)
 
     finally:
-        print("[DEBUG] Closing client connection.\n")
+        log.debug("Closing client connection.")
         client_socket.close()  # Close the client connection
 
 ###############################################################################
@@ -142,9 +337,10 @@ def start_server():
     - Creates a TCP socket.
     - Binds it to the specified HOST and PORT.
     - Listens for incoming connections.
-    - Accepts client connections and passes them to the handle_client() function.
+    - Accepts client connections and hands each one to handle_client() on a worker thread.
+      Errors while accepting a connection are logged and the server keeps running.
     """
-    print("[DEBUG] Starting web server...")
+    log.info("Starting web server...")
 
     # Create a TCP socket using IPv4 (AF_INET) and TCP (SOCK_STREAM)
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -155,21 +351,43 @@ def start_server():
     # Bind the socket to the specified HOST and PORT
     server_socket.bind((HOST, PORT))
 
+    # Set the buffer sizes before listening so accepted connections inherit them
+    tune_socket(server_socket)
+
     # Start listening for incoming connections (maximum of 5 queued connections)
     server_socket.listen(5)
-    print(f"[DEBUG] Server running on http://{HOST}:{PORT}/")
-    print("[DEBUG] Waiting for client connections...\n")
-
-    # Infinite loop to continuously accept and handle client requests
-    while True:
-        # Accept a new client connection
-        client_socket, client_address = server_socket.accept()
-        print(f"[DEBUG] Connection established with {client_address}")
-        handle_client(client_socket)  # Process the client request
+    log.info("Server running on http://%s:%s/", HOST, PORT)
+    log.info("Waiting for client connections...")
+
+    # Worker threads process requests so a slow client never blocks the accept loop
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        # Infinite loop to continuously accept and handle client requests
+        while True:
+            # Accept a new client connection
+            try:
+                client_socket, client_address = server_socket.accept()
+            except OSError as e:
+                # e.g., EMFILE when out of file descriptors; wait for clients to finish
+                log.error("Failed to accept connection: %s", e)
+                time.sleep(ACCEPT_RETRY_DELAY)
+                continue
+
+            log.debug("Connection established with %s", client_address)
+            try:
+                client_socket.settimeout(CLIENT_TIMEOUT)
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError as e:
+                # The client may already have reset the connection
+                client_socket.close()
+                log.error("Failed to set up connection with %s: %s", client_address, e)
+                continue
+
+            pool.submit(handle_client, client_socket)  # Process the client request
 
 ###############################################################################
 # MAIN EXECUTION: START THE SERVER
 ###############################################################################
 
 if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format="[%(levelname)s] %(message)s")
     start_server()  # Run the server